@@ -0,0 +1,36 @@
+"""Add partial indexes for active recording listings
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status <> 'deleted'")
+
+
+def upgrade() -> None:
+    # Serve "status != 'deleted' [AND stream_id = ?] ORDER BY start_ts DESC" without a scan + sort.
+    # Ascending columns: SQLite and Postgres walk the index backwards for DESC order.
+    op.create_index(
+        'idx_rec_active_stream_ts', 'recording', ['stream_id', 'start_ts'],
+        sqlite_where=ACTIVE, postgresql_where=ACTIVE
+    )
+    op.create_index(
+        'idx_rec_active_ts', 'recording', ['start_ts'],
+        sqlite_where=ACTIVE, postgresql_where=ACTIVE
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_rec_active_ts', table_name='recording')
+    op.drop_index('idx_rec_active_stream_ts', table_name='recording')
@@ -0,0 +1,37 @@
+"""Add mime_type to recording
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Media type resolved once at ingest instead of from the extension on every download
+    op.add_column('recording', sa.Column('mime_type', sa.String(), nullable=True))
+
+    # Backfill existing rows; same mapping as app.services.media
+    op.execute("""
+        UPDATE recording SET mime_type = CASE
+            WHEN lower(path) LIKE '%.wav' THEN 'audio/wav'
+            WHEN lower(path) LIKE '%.ogg' THEN 'audio/ogg'
+            WHEN lower(path) LIKE '%.m4a' THEN 'audio/mp4'
+            WHEN lower(path) LIKE '%.aac' THEN 'audio/aac'
+            WHEN lower(path) LIKE '%.flac' THEN 'audio/flac'
+            ELSE 'audio/mpeg'
+        END
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('recording', 'mime_type')
@@ -0,0 +1,48 @@
+"""Add full-text index on recording transcript
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # FTS5 external-content table: indexes recording.transcript without storing a second copy
+    op.execute("CREATE VIRTUAL TABLE recording_fts USING fts5(transcript, content='recording', content_rowid='id')")
+
+    # Keep the index in sync with the transcript column
+    op.execute("""
+        CREATE TRIGGER recording_fts_ai AFTER INSERT ON recording BEGIN
+            INSERT INTO recording_fts(rowid, transcript) VALUES (new.id, new.transcript);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER recording_fts_ad AFTER DELETE ON recording BEGIN
+            INSERT INTO recording_fts(recording_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER recording_fts_au AFTER UPDATE OF transcript ON recording BEGIN
+            INSERT INTO recording_fts(recording_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+            INSERT INTO recording_fts(rowid, transcript) VALUES (new.id, new.transcript);
+        END
+    """)
+
+    # Index transcripts that already exist
+    op.execute("INSERT INTO recording_fts(recording_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER recording_fts_au")
+    op.execute("DROP TRIGGER recording_fts_ad")
+    op.execute("DROP TRIGGER recording_fts_ai")
+    op.execute("DROP TABLE recording_fts")
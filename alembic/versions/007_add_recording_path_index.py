@@ -0,0 +1,24 @@
+"""Add path/status index on recording
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15 13:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covering index for the watcher's "all known paths" query
+    op.create_index('ix_recording_path_status', 'recording', ['path', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recording_path_status', table_name='recording')
@@ -0,0 +1,27 @@
+"""Index recording paths per stream
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The watcher now looks paths up per stream; the leading stream_id column makes
+    # the (path, status) index redundant
+    op.create_index('ix_recording_stream_path_status', 'recording', ['stream_id', 'path', 'status'])
+    op.drop_index('ix_recording_path_status', table_name='recording')
+
+
+def downgrade() -> None:
+    op.create_index('ix_recording_path_status', 'recording', ['path', 'status'])
+    op.drop_index('ix_recording_stream_path_status', table_name='recording')
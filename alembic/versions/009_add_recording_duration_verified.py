@@ -0,0 +1,28 @@
+"""Add duration_verified to recording
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # False while duration_seconds is only the watcher's mtime-based estimate
+    op.add_column('recording', sa.Column('duration_verified', sa.Boolean(), nullable=True))
+
+    # Durations of existing rows were all read from the files
+    op.execute("UPDATE recording SET duration_verified = 1 WHERE duration_seconds > 0")
+
+
+def downgrade() -> None:
+    op.drop_column('recording', 'duration_verified')
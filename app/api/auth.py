@@ -1,6 +1,6 @@
 import os
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import (APIRouter, Depends, HTTPException, Request, Response,
                      status)
@@ -11,6 +11,7 @@ from sqlmodel import Session, select
 
 from app.core.db import get_session
 from app.models.models import User, UserRole
+from app.services.user_cache import user_cache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkeychangeinproduction")
 ALGORITHM = "HS256"
@@ -51,6 +52,15 @@ async def get_current_user(request: Request, session: Session = Depends(get_sess
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user = user_cache.get(token)
+    if user is None:
+        user, token_exp = _verify_token(token, session)
+        user_cache.put(token, user, token_exp=token_exp)
+    if not user.active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return user
+
+def _verify_token(token: str, session: Session) -> Tuple[User, Optional[float]]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -62,9 +72,7 @@ async def get_current_user(request: Request, session: Session = Depends(get_sess
     user = session.exec(select(User).where(User.username == username)).first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    if not user.active:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-    return user
+    return user, payload.get("exp")
 
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
@@ -91,6 +99,9 @@ async def login(response: Response, form_data: OAuth2PasswordRequestForm = Depen
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    token = request.cookies.get("access_token")
+    if token:
+        user_cache.invalidate_token(token)
     response.delete_cookie("access_token")
     return {"msg": "Logged out"}
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -8,7 +9,7 @@ from sqlmodel import Session, select
 
 from app.api import auth, recordings, streams, ui_routes, users
 from app.api.auth import get_password_hash
-from app.core.db import create_db_and_tables, engine, get_session
+from app.core.db import MAX_OVERFLOW, POOL_SIZE, create_db_and_tables, db_session_middleware, engine
 from app.models.models import User, UserRole
 from app.services.stream_manager import manager
 from app.services.watcher import watcher
@@ -18,6 +19,8 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Radio Stream Capture Service")
 
+app.middleware("http")(db_session_middleware)
+
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -32,6 +35,9 @@ app.include_router(ui_routes.router)
 
 @app.on_event("startup")
 async def on_startup():
+    # Sync DB calls run in anyio's threadpool (40 threads by default); let it use the whole connection pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = POOL_SIZE + MAX_OVERFLOW
+
     create_db_and_tables()
     
     with Session(engine) as session:
@@ -49,6 +55,7 @@ async def on_startup():
 @app.on_event("shutdown")
 async def on_shutdown():
     await manager.stop()
+    await watcher.stop()
 
 @app.get("/")
 def root():
@@ -0,0 +1,42 @@
+import base64
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlmodel import desc
+
+from app.models.models import Recording
+
+# Opaque cursor for the page after the one returned, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(start_ts: datetime, recording_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{start_ts.isoformat()}|{recording_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        ts, _, recording_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(ts), int(recording_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate_recordings(query, cursor: Optional[str], skip: int, limit: int):
+    """
+    Newest-first page of a Recording query.
+    With a cursor, seeks past the last row of the previous page through the (start_ts, id) order,
+    so deep pages cost the same as the first; `skip` is kept as an offset fallback.
+    """
+    query = query.order_by(desc(Recording.start_ts), desc(Recording.id))
+    if cursor:
+        start_ts, recording_id = decode_cursor(cursor)
+        query = query.where(tuple_(Recording.start_ts, Recording.id) < (start_ts, recording_id))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int):
+    """Points the client at the next page when this one came back full."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.start_ts, last.id)
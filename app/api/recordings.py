@@ -1,23 +1,25 @@
 import os
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import FileResponse
-from sqlmodel import Session, desc, select
+from sqlmodel import Session, select
 
 from app.api.auth import get_current_admin_user, get_current_user
+from app.api.pagination import paginate_recordings, set_next_cursor
 from app.core.db import get_session
 from app.models.models import Recording, User
+from app.services.media import media_type_for
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Recording])
-def read_recordings(skip: int = 0, limit: int = 100, stream_id: int = None, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def read_recordings(response: Response, skip: int = 0, limit: int = 100, stream_id: int = None, cursor: Optional[str] = None, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     query = select(Recording).where(Recording.status != "deleted")
     if stream_id:
         query = query.where(Recording.stream_id == stream_id)
-    query = query.order_by(desc(Recording.start_ts)).offset(skip).limit(limit)
-    recordings = session.exec(query).all()
+    recordings = session.exec(paginate_recordings(query, cursor, skip, limit)).all()
+    set_next_cursor(response, recordings, limit)
     return recordings
 
 @router.get("/{recording_id}/download")
@@ -28,7 +30,11 @@ def download_recording(recording_id: int, session: Session = Depends(get_session
     if recording.status == "deleted":
         raise HTTPException(status_code=404, detail="Recording has been deleted")
     
-    if not os.path.exists(recording.path):
+    try:
+        stat_result = os.stat(recording.path)
+    except OSError:
+        # Whatever os.path.exists() reported as missing (absent, not a directory, no permission) stays a 404
         raise HTTPException(status_code=404, detail="File not found on disk")
         
-    return FileResponse(recording.path, filename=os.path.basename(recording.path), media_type="audio/wav")
+    media_type = recording.mime_type or media_type_for(recording.path)
+    return FileResponse(recording.path, filename=os.path.basename(recording.path), media_type=media_type, stat_result=stat_result)
@@ -2,23 +2,70 @@ import csv
 import io
 import logging
 import os
-from datetime import datetime
+from datetime import date, datetime, time
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import text
 from sqlmodel import Session, desc, select
 
 from app.api.auth import get_current_user
-from app.core.db import get_session
+from app.api.pagination import paginate_recordings, set_next_cursor
+from app.core.db import engine, get_session
 from app.models.models import Recording, Stream, User, UserRole
+from app.services.media import media_type_for
 from app.services.stats import get_detailed_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+class StreamRef(BaseModel):
+    name: str
+
+class FileItem(BaseModel):
+    id: int
+    stream_id: int
+    stream: Optional[StreamRef] = None
+    path: str
+    start_ts: datetime
+    end_ts: Optional[datetime] = None
+    size_bytes: int
+    duration_seconds: float
+    status: str
+    classification: Optional[str] = None
+    transcript: Optional[str] = None
+    asr_model: Optional[str] = None
+    asr_confidence: Optional[float] = None
+    has_transcript: bool = False
+    segments: Optional[List[dict]] = None  # only with ?include=segments
+
+class TranscriptionResponse(BaseModel):
+    recording_id: int
+    transcript: str
+    segments: List[dict]
+    model: Optional[str] = None
+    confidence: float
+
+EXPORT_HEADER = ["ID", "Stream", "Start Time", "Duration (s)", "Size (Bytes)", "Path", "Status"]
+
+def _apply_file_filters(query, stream_id: Optional[int], date_from: Optional[date], date_to: Optional[date]):
+    """Shared stream/date filters for the file list and CSV export."""
+    if stream_id:
+        query = query.where(Recording.stream_id == stream_id)
+    if date_from:
+        query = query.where(Recording.start_ts >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.where(Recording.start_ts <= datetime.combine(date_to, time.max))
+    return query
+
+def _fts_query(q: str) -> str:
+    """Quote every word, so user input is matched literally instead of parsed as FTS5 syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
 @router.get("/summary")
-async def get_stats_summary(
+def get_stats_summary(
     days: int = 30,
     current_user: User = Depends(get_current_user)
 ):
@@ -27,109 +74,150 @@ async def get_stats_summary(
     """
     return get_detailed_stats(days=days)
 
-@router.get("/files")
-async def list_files(
+@router.get("/files", response_model=List[FileItem], response_model_exclude_unset=True)
+def list_files(
+    response: Response,
     stream_id: Optional[int] = None,
-    date_from: Optional[str] = None, # YYYY-MM-DD
-    date_to: Optional[str] = None,   # YYYY-MM-DD
+    date_from: Optional[date] = None, # YYYY-MM-DD
+    date_to: Optional[date] = None,   # YYYY-MM-DD
+    cursor: Optional[str] = None,   # from the previous page's X-Next-Cursor header
     skip: int = 0,
     limit: int = 50,
+    include: Optional[str] = None,  # comma-separated extras, e.g. "segments"
+    q: Optional[str] = None,        # full-text search in transcripts, all words must match
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     List recordings with filtering.
+    Transcript search goes through the recording_fts index, never through the JSON segments.
+    Selects plain columns instead of ORM objects. Transcript segments can be megabytes
+    per row, so they are left out unless requested with ?include=segments;
+    otherwise clients fetch them per file from /files/{id}/asr.
+    Pages by cursor: follow the X-Next-Cursor response header for the next page.
     """
-    from sqlalchemy.orm import joinedload
+    include_segments = "segments" in (include or "").split(",")
+    columns = [
+        Recording.id,
+        Recording.stream_id,
+        Stream.name.label("stream_name"),
+        Recording.path,
+        Recording.start_ts,
+        Recording.end_ts,
+        Recording.size_bytes,
+        Recording.duration_seconds,
+        Recording.status,
+        Recording.classification,
+        Recording.transcript,
+        Recording.asr_model,
+        Recording.asr_confidence,
+        Recording.asr_ts
+    ]
+    if include_segments:
+        columns.append(Recording.transcript_json)
+
     query = (
-        select(Recording)
-        .options(joinedload(Recording.stream))
+        select(*columns)
+        .join(Stream, Recording.stream_id == Stream.id, isouter=True)
         .where(Recording.status != "deleted")
-        .order_by(desc(Recording.start_ts))
     )
     
-    if stream_id:
-        query = query.where(Recording.stream_id == stream_id)
-    if date_from:
-        dt_from = datetime.strptime(date_from, "%Y-%m-%d")
-        query = query.where(Recording.start_ts >= dt_from)
-    if date_to:
-        dt_to = datetime.strptime(date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-        query = query.where(Recording.start_ts <= dt_to)
-        
-    results = session.exec(query.offset(skip).limit(limit)).all()
+    query = _apply_file_filters(query, stream_id, date_from, date_to)
+    if q and q.strip():
+        query = query.where(
+            text("recording.id IN (SELECT rowid FROM recording_fts WHERE recording_fts MATCH :fts_query)")
+            .bindparams(fts_query=_fts_query(q))
+        )
+    results = session.exec(paginate_recordings(query, cursor, skip, limit)).all()
+    set_next_cursor(response, results, limit)
     
     response_data = []
     for r in results:
-        response_data.append({
+        item = {
             "id": r.id,
             "stream_id": r.stream_id,
-            "stream": {"name": r.stream.name} if r.stream else None,
+            "stream": {"name": r.stream_name} if r.stream_name else None,
             "path": r.path,
-            "start_ts": r.start_ts.isoformat(),
-            "end_ts": r.end_ts.isoformat() if r.end_ts else None,
+            "start_ts": r.start_ts,
+            "end_ts": r.end_ts,
             "size_bytes": r.size_bytes,
             "duration_seconds": r.duration_seconds,
             "status": r.status,
             "classification": r.classification,
             "transcript": r.transcript,
-            "transcript_json": r.transcript_json,
             "asr_model": r.asr_model,
-            "asr_confidence": r.asr_confidence
-        })
+            "asr_confidence": r.asr_confidence,
+            "has_transcript": r.asr_ts is not None and bool(r.transcript)
+        }
+        if include_segments:
+            item["segments"] = r.transcript_json.get("segments", []) if r.transcript_json else []
+        response_data.append(item)
     
     return response_data
 
 @router.get("/files/export")
-async def export_files_csv(
+def export_files_csv(
     stream_id: Optional[int] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    session: Session = Depends(get_session),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
     Export filtered recordings to CSV.
+    Rows are streamed from a server-side cursor, so memory stays flat regardless of result size.
     """
-    from sqlalchemy.orm import joinedload
     query = (
-        select(Recording)
-        .options(joinedload(Recording.stream))
+        select(
+            Recording.id,
+            Recording.stream_id,
+            Recording.start_ts,
+            Recording.duration_seconds,
+            Recording.size_bytes,
+            Recording.path,
+            Recording.status
+        )
         .where(Recording.status != "deleted")
         .order_by(desc(Recording.start_ts))
     )
     
-    if stream_id: query = query.where(Recording.stream_id == stream_id)
-    if date_from: 
-        dt_from = datetime.strptime(date_from, "%Y-%m-%d")
-        query = query.where(Recording.start_ts >= dt_from)
-    if date_to:
-        dt_to = datetime.strptime(date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-        query = query.where(Recording.start_ts <= dt_to)
-        
-    results = session.exec(query).all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["ID", "Stream", "Start Time", "Duration (s)", "Size (Bytes)", "Path", "Status"])
-    
-    for r in results:
-        stream_name = r.stream.name if r.stream else "Unknown"
-        writer.writerow([
-            r.id,
-            stream_name,
-            r.start_ts.isoformat(),
-            r.duration_seconds,
-            r.size_bytes,
-            r.path,
-            r.status
-        ])
-        
-    output.seek(0)
-    return Response(content=output.getvalue(), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=recordings_export.csv"})
+    query = _apply_file_filters(query, stream_id, date_from, date_to)
+
+    def row_iter():
+        # The request-scoped session may be closed before the body is sent,
+        # so the generator owns its own session for the lifetime of the cursor.
+        with Session(engine) as session:
+            stream_names = dict(session.exec(select(Stream.id, Stream.name)).all())
+            result = session.exec(query.execution_options(stream_results=True, yield_per=500))
+
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_HEADER)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+            # One writerows() call and one body chunk per cursor batch
+            for rows in result.partitions():
+                writer.writerows(
+                    (
+                        r.id,
+                        stream_names.get(r.stream_id, "Unknown"),
+                        r.start_ts.isoformat(),
+                        r.duration_seconds,
+                        r.size_bytes,
+                        r.path,
+                        r.status
+                    )
+                    for r in rows
+                )
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+
+    return StreamingResponse(row_iter(), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=recordings_export.csv"})
 
 @router.get("/files/{file_id}/download")
-async def download_file(
+def download_file(
     file_id: int,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
@@ -144,20 +232,26 @@ async def download_file(
     if recording.status == "deleted":
         raise HTTPException(status_code=404, detail="Recording has been deleted")
     
-    if not os.path.exists(recording.path):
+    try:
+        stat_result = os.stat(recording.path)
+    except OSError:
+        # Whatever os.path.exists() reported as missing (absent, not a directory, no permission) stays a 404
         raise HTTPException(status_code=404, detail="File descriptor exists but file missing on disk")
         
     filename = os.path.basename(recording.path)
-    return FileResponse(recording.path, filename=filename)
+    media_type = recording.mime_type or media_type_for(recording.path)
+    return FileResponse(recording.path, filename=filename, media_type=media_type, stat_result=stat_result)
 
 @router.get("/files/{file_id}/stream")
-async def stream_file(
+def stream_file(
     file_id: int,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Stream audio file for in-browser playback.
+    FileResponse honours Range headers (206 + Content-Range), so seeking in the
+    player only fetches the requested window instead of restarting from byte 0.
     """
     recording = session.get(Recording, file_id)
     if not recording:
@@ -166,37 +260,39 @@ async def stream_file(
     if recording.status == "deleted":
         raise HTTPException(status_code=404, detail="Recording has been deleted")
     
-    if not os.path.exists(recording.path):
+    try:
+        stat_result = os.stat(recording.path)
+    except OSError:
+        # Whatever os.path.exists() reported as missing (absent, not a directory, no permission) stays a 404
         raise HTTPException(status_code=404, detail="File descriptor exists but file missing on disk")
     
-    # Determine media type based on file extension
-    file_ext = os.path.splitext(recording.path)[1].lower()
-    media_type_map = {
-        '.mp3': 'audio/mpeg',
-        '.wav': 'audio/wav',
-        '.ogg': 'audio/ogg',
-        '.m4a': 'audio/mp4',
-        '.aac': 'audio/aac',
-        '.flac': 'audio/flac'
-    }
-    media_type = media_type_map.get(file_ext, 'audio/mpeg')
-    
-    return FileResponse(recording.path, media_type=media_type)
+    media_type = recording.mime_type or media_type_for(recording.path)
+    return FileResponse(recording.path, media_type=media_type, stat_result=stat_result)
 
-@router.get("/files/{file_id}/asr")
-async def get_transcription(
+@router.get("/files/{file_id}/asr", response_model=TranscriptionResponse)
+def get_transcription(
     file_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get existing transcription for an audio file.
     Returns transcription with timestamps and metadata if available.
+    A transcript only changes when ASR is re-run, so asr_ts doubles as its ETag
+    and replays are answered with 304 without loading the transcript columns.
     """
+    row = session.exec(select(Recording.id, Recording.asr_ts).where(Recording.id == file_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    etag = f'"{row.id}-{row.asr_ts.isoformat()}"' if row.asr_ts else None
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
     # Get recording from database
     recording = session.get(Recording, file_id)
-    if not recording:
-        raise HTTPException(status_code=404, detail="Recording not found")
     
     # Check if transcription exists
     if not recording.transcript or not recording.asr_ts:
@@ -205,6 +301,9 @@ async def get_transcription(
             detail="No transcription available for this recording"
         )
     
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
     # Return existing transcription
     return {
         "recording_id": recording.id,
@@ -213,4 +312,3 @@ async def get_transcription(
         "model": recording.asr_model,
         "confidence": recording.asr_confidence or 0.0
     }
-
@@ -6,14 +6,14 @@ from sqlmodel import Session, select
 from app.api.auth import get_current_admin_user, get_current_user
 from app.core.db import get_session
 from app.models.models import Stream, User
+from app.services.stream_cache import stream_cache
 from app.services.stream_manager import manager
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Stream])
 def read_streams(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
-    streams = session.exec(select(Stream)).all()
-    return streams
+    return stream_cache.get_all(session)
 
 @router.get("/{stream_id}", response_model=Stream)
 def read_stream(stream_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
@@ -30,7 +30,7 @@ def create_stream(stream: Stream, session: Session = Depends(get_session), curre
     
     session.add(stream)
     session.commit()
-    session.refresh(stream)
+    stream_cache.invalidate()
     return stream
 
 @router.put("/{stream_id}", response_model=Stream)
@@ -48,7 +48,7 @@ async def update_stream(stream_id: int, stream_data: Stream, session: Session =
     
     session.add(db_stream)
     session.commit()
-    session.refresh(db_stream)
+    stream_cache.invalidate()
     
     return db_stream
 
@@ -62,6 +62,7 @@ async def delete_stream(stream_id: int, session: Session = Depends(get_session),
     
     session.delete(stream)
     session.commit()
+    stream_cache.invalidate()
     return {"ok": True}
 
 @router.post("/{stream_id}/start")
@@ -73,6 +74,7 @@ async def start_stream_endpoint(stream_id: int, session: Session = Depends(get_s
     stream.enabled = True
     session.add(stream)
     session.commit()
+    stream_cache.invalidate()
     
     asyncio.create_task(manager.reconcile_streams())
     
@@ -87,6 +89,7 @@ async def stop_stream_endpoint(stream_id: int, session: Session = Depends(get_se
     stream.enabled = False
     session.add(stream)
     session.commit()
+    stream_cache.invalidate()
     
     await manager.stop_stream(stream_id)
     return {"status": "stopped"}
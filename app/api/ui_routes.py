@@ -1,13 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from sqlmodel import Session, desc, select
 
 from app.api.auth import get_current_user
 from app.core.db import get_session
 from app.models.models import Recording, Stream, User, UserRole
+from app.services.stream_cache import stream_cache
 
 templates = Jinja2Templates(directory="app/templates")
+# Templates only change on deploy: skip the per-render mtime check and compile them all up front.
+# The bytecode cache lets restarted workers skip re-parsing.
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+for template_name in templates.env.list_templates():
+    templates.env.get_template(template_name)
 router = APIRouter()
 
 # Helper to inject user into template context
@@ -38,19 +46,19 @@ def login_page(request: Request):
 @router.get("/dashboard")
 async def dashboard(request: Request, user: User = Depends(login_required), session: Session = Depends(get_session)):
     if not user: return RedirectResponse("/login")
-    streams = session.exec(select(Stream)).all()
+    streams = stream_cache.get_all(session)
     return templates.TemplateResponse("dashboard.html", {"request": request, "user": user, "streams": streams})
 
 @router.get("/stats")
 async def stats_page(request: Request, user: User = Depends(login_required), session: Session = Depends(get_session)):
     if not user: return RedirectResponse("/login")
-    streams = session.exec(select(Stream)).all() # For filter dropdowns if needed
+    streams = stream_cache.get_all(session) # For filter dropdowns if needed
     return templates.TemplateResponse("stats.html", {"request": request, "user": user, "streams": streams})
 
 @router.get("/streams")
 async def streams_page(request: Request, user: User = Depends(login_required), session: Session = Depends(get_session)):
     if not user: return RedirectResponse("/login")
-    streams = session.exec(select(Stream)).all()
+    streams = stream_cache.get_all(session)
     return templates.TemplateResponse("streams.html", {"request": request, "user": user, "streams": streams})
 
 @router.get("/streams/new")
@@ -85,7 +93,7 @@ async def edit_stream_page(request: Request, stream_id: int, user: User = Depend
 @router.get("/recordings")
 async def recordings_page(request: Request, user: User = Depends(login_required), session: Session = Depends(get_session)):
     if not user: return RedirectResponse("/login")
-    streams = session.exec(select(Stream)).all()
+    streams = stream_cache.get_all(session)
     return templates.TemplateResponse("recordings.html", {"request": request, "user": user, "streams": streams})
 
 @router.get("/settings")
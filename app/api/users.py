@@ -7,6 +7,7 @@ from sqlmodel import Session, select
 from app.api.auth import get_current_admin_user, get_password_hash
 from app.core.db import get_session
 from app.models.models import User, UserRole
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -48,7 +49,6 @@ def create_user(user_in: UserCreate, session: Session = Depends(get_session), cu
     )
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
     return db_user
 
 @router.put("/{user_id}", response_model=User)
@@ -66,7 +66,7 @@ def update_user(user_id: int, user_in: UserUpdate, session: Session = Depends(ge
         
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
+    user_cache.invalidate_user(db_user.username)
     return db_user
 
 @router.delete("/{user_id}")
@@ -77,6 +77,8 @@ def delete_user(user_id: int, session: Session = Depends(get_session), current_u
     if db_user.id == current_user.id:
          raise HTTPException(status_code=400, detail="Cannot delete yourself")
          
+    username = db_user.username
     session.delete(db_user)
     session.commit()
+    user_cache.invalidate_user(username)
     return {"ok": True}
@@ -1,15 +1,47 @@
 import os
 
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, SQLModel, create_engine
 
 # Persistent database path
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:////data/database.sqlite")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+POOL_SIZE = 20
+MAX_OVERFLOW = 40
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets the watcher's commits proceed without blocking API readers, and with
+    # synchronous=NORMAL a commit no longer waits for an fsync (durable at the next checkpoint)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+# expire_on_commit=False: objects stay loaded after commit, so returning them doesn't re-SELECT
+SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False, expire_on_commit=False)
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+async def db_session_middleware(request: Request, call_next):
+    # One session per request, closed as soon as the endpoint has produced its response
+    with SessionLocal() as session:
+        request.state.db = session
+        return await call_next(request)
+
+def get_session(request: Request) -> Session:
+    return request.state.db
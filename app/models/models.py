@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Column, String
+from sqlalchemy import DDL, Column, Index, String, event, text
 from sqlmodel import JSON, Field, Relationship, SQLModel
 
 
@@ -29,7 +29,7 @@ class Stream(SQLModel, table=True):
     # mandatory_params example: {"format": "mp3", "segment_time": 3600, "channels": 2}
     mandatory_params: dict = Field(default={}, sa_column=Column(JSON))
     
-    # optional_params example: {"bitrate": "128k", "retention_days": 30, "retry_delay": 5}
+    # optional_params example: {"bitrate": "128k", "retention_days": 30, "retry_delay": 5, "force_classification": "speech"}
     optional_params: dict = Field(default={}, sa_column=Column(JSON))
     
     last_up: Optional[datetime] = None
@@ -40,13 +40,29 @@ class Stream(SQLModel, table=True):
     events: List["Event"] = Relationship(back_populates="stream")
 
 class Recording(SQLModel, table=True):
+    # Partial indexes for "active recordings, newest first" listings; deleted rows are left out
+    __table_args__ = (
+        Index(
+            "idx_rec_active_stream_ts", "stream_id", "start_ts",
+            sqlite_where=text("status <> 'deleted'"), postgresql_where=text("status <> 'deleted'")
+        ),
+        Index(
+            "idx_rec_active_ts", "start_ts",
+            sqlite_where=text("status <> 'deleted'"), postgresql_where=text("status <> 'deleted'")
+        ),
+        # Covers the watcher's known-paths query (stream_id, path IN ..., status != 'deleted') without touching the table
+        Index("ix_recording_stream_path_status", "stream_id", "path", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     stream_id: int = Field(foreign_key="stream.id")
     path: str
     start_ts: datetime
     end_ts: Optional[datetime] = None
     size_bytes: int = Field(default=0)
+    mime_type: Optional[str] = Field(default=None) # resolved from the extension at ingest
     duration_seconds: float = Field(default=0.0)
+    duration_verified: Optional[bool] = Field(default=None) # False until duration_seconds is known (read from the file, or an mtime estimate matching the segment length); it is 0 meanwhile
     status: str = Field(default="recording") # recording, completed, error
     classification: Optional[str] = Field(default=None) # speech, music, ad
     
@@ -76,3 +92,21 @@ class Notification(SQLModel, table=True):
     daily_report_time: Optional[str] = None # HH:MM format
     thresholds: dict = Field(default={}, sa_column=Column(JSON)) 
     # thresholds example: {"disk_min_gb": 5, "error_burst_limit": 10}
+
+# Full-text index over Recording.transcript (SQLite FTS5, external content: stores only the index).
+# Kept in sync by triggers; created with the table on fresh databases and by migration 006 on existing ones.
+RECORDING_FTS_DDL = [
+    "CREATE VIRTUAL TABLE recording_fts USING fts5(transcript, content='recording', content_rowid='id')",
+    """CREATE TRIGGER recording_fts_ai AFTER INSERT ON recording BEGIN
+        INSERT INTO recording_fts(rowid, transcript) VALUES (new.id, new.transcript);
+    END""",
+    """CREATE TRIGGER recording_fts_ad AFTER DELETE ON recording BEGIN
+        INSERT INTO recording_fts(recording_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+    END""",
+    """CREATE TRIGGER recording_fts_au AFTER UPDATE OF transcript ON recording BEGIN
+        INSERT INTO recording_fts(recording_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+        INSERT INTO recording_fts(rowid, transcript) VALUES (new.id, new.transcript);
+    END""",
+]
+for _stmt in RECORDING_FTS_DDL:
+    event.listen(Recording.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
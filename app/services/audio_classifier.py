@@ -4,10 +4,11 @@ Classifies audio files as speech, music, or advertisement.
 """
 import logging
 import os
-from typing import Optional
+from typing import List, Optional
 
 import librosa
 import numpy as np
+import soundfile as sf
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,67 @@ logger = logging.getLogger(__name__)
 _model = None
 _labels = None
 
+# Categories in tie-break order, matching the '<category>_indices' label groups
+CATEGORIES = ("speech", "music", "ad")
+
+# PANNs CNN14 expects 32kHz mono input
+SAMPLE_RATE = 32000
+# Model input is always padded/cropped to this length, the shape the TorchScript model was traced with
+CLIP_SAMPLES = SAMPLE_RATE * 10
+TRACED_MODEL_FILE = 'cnn14_int8_traced.pt'
+# Clips only feed a classifier, so the fastest resampler is good enough
+RESAMPLE_TYPE = 'soxr_lq'
+
+
+class _TracedTagger:
+    """Drop-in for panns_inference.AudioTagging.inference() over a TorchScript CNN14."""
+
+    def __init__(self, module):
+        self.module = module
+
+    def inference(self, audio: np.ndarray):
+        import torch
+        with torch.inference_mode():
+            output = self.module(torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)))
+        return output['clipwise_output'].numpy(), output['embedding'].numpy()
+
+
+def _load_traced_model(cache_dir: str):
+    """
+    Load int8 (dynamic) CNN14 as TorchScript from the cache dir, tracing and saving it there on first use.
+    Later starts skip building the module graph and loading the state dict.
+    """
+    import torch
+
+    traced_path = os.path.join(cache_dir, TRACED_MODEL_FILE)
+    if os.path.exists(traced_path):
+        try:
+            return torch.jit.load(traced_path, map_location='cpu')
+        except Exception as e:
+            logger.warning(f"Could not load traced model {traced_path}, tracing again: {e}")
+
+    from panns_inference import AudioTagging
+
+    module = AudioTagging(checkpoint_path=None, device='cpu').model.eval()
+    # int8 weights for the dense tail (fc1, fc_audioset); activations are quantized on the fly
+    module = torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+    with torch.no_grad():
+        # strict=False: the model returns a dict of outputs
+        traced = torch.jit.trace(module, torch.zeros(1, CLIP_SAMPLES), strict=False)
+
+    tmp_path = f"{traced_path}.tmp"
+    torch.jit.save(traced, tmp_path)
+    os.replace(tmp_path, traced_path)
+    logger.info(f"Saved traced PANNs model to {traced_path}")
+    return traced
+
+
+def _fit_clip(audio: np.ndarray) -> np.ndarray:
+    """Zero-pad or crop a clip to CLIP_SAMPLES."""
+    if len(audio) < CLIP_SAMPLES:
+        return np.pad(audio, (0, CLIP_SAMPLES - len(audio)))
+    return audio[:CLIP_SAMPLES]
+
 
 def _get_model():
     """Lazy load the PANNs model."""
@@ -22,11 +84,15 @@ def _get_model():
     
     if _model is None:
         try:
-            # Set PyTorch to use single thread to avoid conflicts
+            # Inference runs one batch at a time on the watcher's single worker, so let it use every core
             import torch
-            torch.set_num_threads(1)
-            os.environ['OMP_NUM_THREADS'] = '1'
-            os.environ['MKL_NUM_THREADS'] = '1'
+            torch.set_num_threads(os.cpu_count() or 1)
+            try:
+                torch.set_num_interop_threads(2)
+            except RuntimeError:
+                # Only settable before the first parallel op in the process
+                pass
+            torch.backends.mkldnn.enabled = True
             
             # Set cache directory for model downloads to persistent volume
             cache_dir = os.environ.get('PANNS_CACHE_DIR', '/data/models/panns')
@@ -35,17 +101,16 @@ def _get_model():
             # Set torch hub cache to persistent location
             torch.hub.set_dir(cache_dir)
             
-            from panns_inference import AudioTagging
-            
             logger.info(f"Loading PANNs CNN14 model (cache dir: {cache_dir})...")
-            _model = AudioTagging(checkpoint_path=None, device='cpu')
+            _model = _TracedTagger(_load_traced_model(cache_dir))
             
             # AudioSet class labels that we'll use for classification
             # These are indices in the AudioSet ontology
+            # Kept as index arrays so the per-category means are a single fancy-indexing op
             _labels = {
-                'speech_indices': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],  # Speech-related classes
-                'music_indices': [137, 138, 139, 140, 141, 142, 143, 144, 145],  # Music-related classes
-                'ad_indices': [429, 430, 431]  # Jingle, commercial-like sounds
+                'speech_indices': np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10], dtype=np.intp),  # Speech-related classes
+                'music_indices': np.array([137, 138, 139, 140, 141, 142, 143, 144, 145], dtype=np.intp),  # Music-related classes
+                'ad_indices': np.array([429, 430, 431], dtype=np.intp)  # Jingle, commercial-like sounds
             }
             
             logger.info("PANNs CNN14 model loaded successfully")
@@ -56,6 +121,41 @@ def _get_model():
     return _model, _labels
 
 
+def _load_clip(file_path: str, duration: float) -> np.ndarray:
+    """
+    Load the first `duration` seconds of a file as 32kHz mono float32.
+    Reads through libsndfile and only decodes the frames needed; falls back to librosa
+    (audioread) for formats libsndfile can't open.
+    """
+    try:
+        with sf.SoundFile(file_path) as f:
+            native_sr = f.samplerate
+            data = f.read(frames=int(native_sr * duration), dtype='float32', always_2d=True)
+    except RuntimeError as e:
+        logger.info(f"soundfile could not read {file_path} ({e}), falling back to librosa")
+        audio, _ = librosa.load(file_path, sr=SAMPLE_RATE, mono=True, duration=duration, res_type=RESAMPLE_TYPE)
+        return audio
+
+    audio = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+    if native_sr != SAMPLE_RATE:
+        audio = librosa.resample(audio, orig_sr=native_sr, target_sr=SAMPLE_RATE, res_type=RESAMPLE_TYPE)
+    return audio
+
+
+def _category_probs(probs: np.ndarray, labels: dict) -> np.ndarray:
+    """Mean class probability per category, in CATEGORIES order."""
+    return np.array([probs[labels[f'{category}_indices']].mean() for category in CATEGORIES])
+
+
+def warmup_classifier():
+    """
+    Load the PANNs model ahead of the first recording instead of on demand,
+    and run one silent clip through it so oneDNN picks its kernels before real work arrives.
+    """
+    model, _ = _get_model()
+    model.inference(np.zeros((1, CLIP_SAMPLES), dtype=np.float32))
+
+
 def classify_audio(file_path: str) -> Optional[str]:
     """
     Classify an audio file as speech, music, or ad.
@@ -79,11 +179,11 @@ def classify_audio(file_path: str) -> Optional[str]:
         model, labels = _get_model()
         logger.info("Model loaded successfully")
         
-        # Load audio file - librosa returns 1D array
+        # Load audio file - 1D array
         logger.info(f"Loading audio file: {file_path}")
         try:
-            audio, sr = librosa.load(file_path, sr=32000, mono=True, duration=10.0)
-            logger.info(f"Audio loaded: shape={audio.shape}, sr={sr}, dtype={audio.dtype}")
+            audio = _fit_clip(_load_clip(file_path, duration=10.0))
+            logger.info(f"Audio loaded: shape={audio.shape}, sr={SAMPLE_RATE}, dtype={audio.dtype}")
         except Exception as e:
             logger.error(f"Failed to load audio file: {e}")
             raise Exception(f"Audio loading failed: {str(e)}")
@@ -112,21 +212,13 @@ def classify_audio(file_path: str) -> Optional[str]:
         probs = clipwise_output[0]
         
         # Calculate aggregate probabilities for each category
-        speech_prob = np.mean([probs[i] for i in labels['speech_indices']])
-        music_prob = np.mean([probs[i] for i in labels['music_indices']])
-        ad_prob = np.mean([probs[i] for i in labels['ad_indices']])
+        category_probs = _category_probs(probs, labels)
+        speech_prob, music_prob, ad_prob = category_probs
         
         logger.info(f"Classification probabilities - Speech: {speech_prob:.3f}, Music: {music_prob:.3f}, Ad: {ad_prob:.3f}")
         
-        # Determine the classification based on highest probability
-        max_prob = max(speech_prob, music_prob, ad_prob)
-        
-        if max_prob == speech_prob:
-            result = "speech"
-        elif max_prob == music_prob:
-            result = "music"
-        else:
-            result = "ad"
+        # Determine the classification based on highest probability (ties go to the earlier category)
+        result = CATEGORIES[int(np.argmax(category_probs))]
             
         logger.info(f"Classification result: {result}")
         return result
@@ -138,6 +230,45 @@ def classify_audio(file_path: str) -> Optional[str]:
         raise Exception(f"Classification failed: {str(e)}")
 
 
+def classify_audio_batch(file_paths: List[str]) -> List[Optional[str]]:
+    """
+    Classify several audio files with a single forward pass.
+    
+    Args:
+        file_paths: Paths to the audio files
+        
+    Returns:
+        One label per path, in order: "speech", "music", "ad",
+        or None for a file that could not be loaded (the error is logged).
+        
+    Raises:
+        Exception: If model loading or inference fails
+    """
+    model, labels = _get_model()
+    
+    # First 10 seconds of each file, all the same length so they stack into one batch
+    clips = []
+    loaded = []
+    for i, file_path in enumerate(file_paths):
+        try:
+            clips.append(_fit_clip(_load_clip(file_path, duration=10.0)))
+            loaded.append(i)
+        except Exception as e:
+            logger.error(f"Failed to load audio file {file_path}: {e}")
+    
+    results: List[Optional[str]] = [None] * len(file_paths)
+    if not clips:
+        return results
+    
+    # clipwise_output shape: (batch_size, 527)
+    clipwise_output, _ = model.inference(np.stack(clips))
+    for i, probs in zip(loaded, clipwise_output):
+        results[i] = CATEGORIES[int(np.argmax(_category_probs(probs, labels)))]
+    
+    logger.info(f"Classified {len(clips)} recording(s) in one batch")
+    return results
+
+
 def get_classification_with_confidence(file_path: str) -> tuple[Optional[str], float]:
     """
     Classify an audio file and return the classification with confidence score.
@@ -155,35 +286,21 @@ def get_classification_with_confidence(file_path: str) -> tuple[Optional[str], f
         model, labels = _get_model()
         
         # Load audio file (first 30 seconds)
-        audio, sr = librosa.load(file_path, sr=32000, mono=True, duration=30.0)
+        audio = _load_clip(file_path, duration=30.0)
         
         # Ensure audio is the right length
-        target_length = 32000 * 10
-        if len(audio) < target_length:
-            audio = np.pad(audio, (0, target_length - len(audio)))
-        else:
-            audio = audio[:target_length]
+        audio = _fit_clip(audio)
         
         # Run inference
         clipwise_output, embedding = model.inference(audio[None, :])
         probs = clipwise_output[0]
         
         # Calculate aggregate probabilities
-        speech_prob = np.mean([probs[i] for i in labels['speech_indices']])
-        music_prob = np.mean([probs[i] for i in labels['music_indices']])
-        ad_prob = np.mean([probs[i] for i in labels['ad_indices']])
+        category_probs = _category_probs(probs, labels)
         
         # Determine classification and confidence
-        max_prob = max(speech_prob, music_prob, ad_prob)
-        
-        if max_prob == speech_prob:
-            classification = "speech"
-        elif max_prob == music_prob:
-            classification = "music"
-        else:
-            classification = "ad"
-        
-        return classification, float(max_prob)
+        best = int(np.argmax(category_probs))
+        return CATEGORIES[best], float(category_probs[best])
         
     except FileNotFoundError:
         raise
@@ -0,0 +1,18 @@
+from types import MappingProxyType
+
+# Media types served for recordings, keyed by lower-case file extension (read-only)
+MEDIA_TYPES = MappingProxyType({
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg',
+    'm4a': 'audio/mp4',
+    'aac': 'audio/aac',
+    'flac': 'audio/flac'
+})
+DEFAULT_MEDIA_TYPE = 'audio/mpeg'
+
+
+def media_type_for(path: str) -> str:
+    """Media type for a recording path, by extension."""
+    # rpartition is cheaper than os.path.splitext; a dotted directory with an extensionless file just misses the map
+    return MEDIA_TYPES.get(path.rpartition('.')[2].lower(), DEFAULT_MEDIA_TYPE)
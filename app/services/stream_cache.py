@@ -0,0 +1,33 @@
+import time
+from typing import List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.models.models import Stream
+
+# Streams change rarely but are listed on every page render and API poll
+STREAMS_TTL_SECONDS = 60
+
+class StreamCache:
+    def __init__(self, ttl: float = STREAMS_TTL_SECONDS):
+        self.ttl = ttl
+        self._entry: Optional[Tuple[float, List[Stream]]] = None
+
+    def get_all(self, session: Session) -> List[Stream]:
+        """
+        Returns all streams, re-querying at most once per TTL.
+        Entries are detached copies, so they stay readable after `session` closes.
+        """
+        now = time.monotonic()
+        if self._entry and now - self._entry[0] < self.ttl:
+            return self._entry[1]
+
+        streams = [Stream.model_validate(s) for s in session.exec(select(Stream)).all()]
+        self._entry = (now, streams)
+        return streams
+
+    def invalidate(self):
+        """Drop the cached list; call after any change to a Stream row."""
+        self._entry = None
+
+stream_cache = StreamCache()
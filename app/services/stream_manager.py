@@ -9,6 +9,7 @@ from sqlmodel import Session, select
 from app.core.db import engine, get_session
 from app.models.models import Event, Recording, Stream
 from app.services.ffmpeg_builder import FfmpegBuilder
+from app.services.stream_cache import stream_cache
 
 logger = logging.getLogger(__name__)
 
@@ -132,6 +133,7 @@ class StreamManager:
             stream.last_error = None
             session.add(stream)
             session.commit()
+            stream_cache.invalidate()
             
             # Log event
             event = Event(stream_id=stream.id, level="info", message="Stream started")
@@ -147,6 +149,7 @@ class StreamManager:
             stream.last_error = str(e)
             session.add(stream)
             session.commit()
+            stream_cache.invalidate()
 
     async def stop_stream(self, stream_id: int):
         if stream_id in self.processes:
@@ -166,6 +169,7 @@ class StreamManager:
                     stream.current_status = "stopped"
                     session.add(stream)
                     session.commit()
+                    stream_cache.invalidate()
 
     async def handle_failure(self, stream: Stream, session: Session):
         # Clean up process handle
@@ -176,6 +180,7 @@ class StreamManager:
         stream.last_error = "Process exited unexpectedly"
         session.add(stream)
         session.commit()
+        stream_cache.invalidate()
         
         event = Event(stream_id=stream.id, level="error", message="Stream process died")
         session.add(event)
@@ -0,0 +1,55 @@
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+from app.models.models import User
+
+# Authenticated users, so page renders and API polls skip the JWT decode and user lookup
+USERS_TTL_SECONDS = 300
+USERS_MAXSIZE = 4096
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class UserCache:
+    def __init__(self, ttl: float = USERS_TTL_SECONDS, maxsize: int = USERS_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[str, Tuple[float, User]] = {}
+
+    def get(self, token: str) -> Optional[User]:
+        """Returns the user a token was verified for, or None if unknown or expired."""
+        key = _token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, token: str, user: User, token_exp: Optional[float] = None):
+        """
+        Remembers a verified token for the TTL, or until the token's own `exp` (epoch seconds) if sooner.
+        Stores a detached copy, so it stays readable after the request's session closes.
+        """
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        if len(self._entries) >= self.maxsize:
+            # Oldest first: dicts keep insertion order
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[_token_key(token)] = (time.monotonic() + ttl, User.model_validate(user))
+
+    def invalidate_token(self, token: str):
+        self._entries.pop(_token_key(token), None)
+
+    def invalidate_user(self, username: str):
+        """Drop every cached token of a user; call after any change to that User row."""
+        for key, (_, user) in list(self._entries.items()):
+            if user.username == username:
+                self._entries.pop(key, None)
+
+user_cache = UserCache()
@@ -1,183 +1,648 @@
 import asyncio
 import logging
 import os
-import subprocess
+import re
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
 
-from sqlmodel import Session, select
+import av
+import soundfile as sf
+from mutagen.mp3 import MP3
+from sqlmodel import Session, func, select, update
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+try:
+    # Optional: submits cleanup unlinks as io_uring batches (Linux 5.6+)
+    import liburing
+except ImportError:
+    liburing = None
 
 from app.core.db import engine
 from app.models.models import Recording, Stream
-from app.services.audio_classifier import classify_audio
-from app.services.asr import transcribe
+from app.services.audio_classifier import CATEGORIES, classify_audio_batch, warmup_classifier
+from app.services.asr import transcribe_batch, warmup_asr
+from app.services.media import media_type_for
+from app.services.stream_cache import stream_cache
 
 logger = logging.getLogger(__name__)
+# Segment file names carry their UTC start time: chunk_20230101120000.mp3
+_TS_RE = re.compile(r"chunk_(\d{14})\.")
+RECORDINGS_ROOT = "/data/recordings"
 DEFAULT_RETENTION_DAYS = 3
+# With inotify events the periodic full scan is only a reconciliation pass; without them it is the only source
+FULL_SCAN_INTERVAL = timedelta(hours=1)
+# Closed files indexed per batch, and how long to wait for more to close after the first
+CLOSED_BATCH_SIZE = 64
+CLOSED_BATCH_WAIT_SECONDS = 1.0
+# Segment length when a stream doesn't set segment_time (same default as FFmpegCommandBuilder),
+# and how far a recording's mtime-based duration may stray from it before its header is read instead
+DEFAULT_SEGMENT_SECONDS = 3600
+SEGMENT_DURATION_TOLERANCE_SECONDS = 5.0
+# Paths per existence query in scan_files, well below SQLite's bound parameter limit
+KNOWN_PATHS_CHUNK = 500
+# Stat new files in inode order rather than directory hash order: sequential inode table reads on cold HDDs.
+# Costs one in-memory sort per scan; SCAN_SORT_BY_INODE=0 turns it off
+SCAN_SORT_BY_INODE = os.getenv("SCAN_SORT_BY_INODE", "1") != "0"
+# How long a stream directory's existence check is trusted
+DIR_EXISTS_TTL_SECONDS = 300
+# Streams scanned at the same time, each on its own thread
+SCAN_CONCURRENCY = 8
+# Parallel file deletions during retention cleanup
+CLEANUP_DELETE_WORKERS = 8
+# Unlinks submitted per io_uring_enter call when liburing is installed
+URING_QUEUE_DEPTH = 128
+# Recordings classified per batch, and how long to wait for more to queue up after the first
+CLASSIFY_BATCH_SIZE = 8
+CLASSIFY_BATCH_WAIT_SECONDS = 2.0
+# Recordings transcribed per batch, and how long to wait for more to queue up after the first
+ASR_BATCH_SIZE = 8
+ASR_BATCH_WAIT_SECONDS = 1.0
+
+def _iter_media(dir_path: str):
+    """
+    Recording files under dir_path, recursively, as DirEntry objects.
+    scandir returns type (and on some platforms stat) data with the listing, so this costs
+    directory reads rather than a stat per file. A missing directory yields nothing.
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_media(entry.path)
+                elif entry.name.endswith((".wav", ".mp3")) and entry.is_file(follow_symlinks=False):
+                    yield entry
+    except FileNotFoundError:
+        return
+
+async def _next_batch(queue: asyncio.Queue, max_size: int, wait_seconds: float) -> list:
+    """Wait for one queued item, then take more as long as each arrives within `wait_seconds`."""
+    batch = [await queue.get()]
+    while len(batch) < max_size:
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=wait_seconds))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+class _ClosedFileHandler(FileSystemEventHandler):
+    """Hands the paths of recordings ffmpeg has finished writing (IN_CLOSE_WRITE) to the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self._loop = loop
+        self._queue = queue
+
+    def on_closed(self, event):
+        if not event.is_directory and event.src_path.endswith((".wav", ".mp3")):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event.src_path)
 
 class RecordingWatcher:
     def __init__(self):
         self.running = False
         self._last_cleanup: datetime | None = None
+        self._last_full_scan: datetime | None = None
+        # inotify watch on RECORDINGS_ROOT; None while polling
+        self._observer: Observer | None = None
+        # Paths of recordings closed since the last batch, filled by _ClosedFileHandler
+        self._closed_queue: asyncio.Queue = asyncio.Queue()
+        # Reused by every scan and cleanup cycle (see _cycle_session); the workers open their own
+        self._session: Session | None = None
+        # (stream_id, path) of every live recording seen so far, so rescans of unchanged partitions
+        # need no SQL; misses are confirmed against the DB by _known_paths, so it fills up lazily
+        self._known: Set[tuple] = set()
+        # Streams whose partitions since their newest recording have been scanned since startup
+        self._caught_up: Set[int] = set()
+        # Stream id -> {partition directory: its mtime_ns when every file in it was settled}, see _scan_stream
+        self._dir_watermarks: dict[int, dict[str, int]] = {}
+        # Stream id -> lock held for the whole of _scan_stream: full scans and close events scan on
+        # separate threads, and recording.path isn't unique, so two concurrent scans could insert a file twice
+        self._scan_locks: dict[int, threading.Lock] = {}
+        # Stream base directory -> (checked at, exists), see _dir_exists
+        self._dir_exists_cache: dict[str, tuple[float, bool]] = {}
+        # Stream id -> (raw retention_days value, resolved days), see _resolve_retention_days
+        self._retention_cache: dict[int, tuple[object, int]] = {}
         # Thread pool for CPU-intensive tasks (classification and ASR)
         # max_workers=1 ensures only one file is processed at a time
         # we need it since ASR isn't thread-safe
         self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watcher-worker")
+        # New recordings waiting for classification: (recording_id, file_path, language, forced_classification, measure)
+        # and speech recordings waiting for ASR: (recording_id, file_path, language)
+        self._classify_queue: asyncio.Queue = asyncio.Queue()
+        self._asr_queue: asyncio.Queue = asyncio.Queue()
 
     async def start(self):
         self.running = True
         logger.info("Recording Watcher started.")
+        # Warm up on the worker thread: first in line, ahead of any file, and never concurrent with inference
+        asyncio.get_running_loop().run_in_executor(self._executor, self._warm_models)
+        # Rows flagged for measuring before a restart lost their place in the in-memory classify queue;
+        # listed before the first scan, so nothing this run queues itself is measured twice
+        unverified = await asyncio.to_thread(self._unverified_recordings)
+        self._start_observer()
         asyncio.create_task(self.loop())
+        asyncio.create_task(self._closed_worker())
+        asyncio.create_task(self._classify_worker())
+        asyncio.create_task(self._asr_worker())
+        if unverified:
+            asyncio.create_task(self._measure_unverified(unverified))
+
+    @contextmanager
+    def _cycle_session(self):
+        """
+        The watcher's long-lived session for a scan or cleanup cycle; cycles never overlap.
+        Everything is expired on entry so the cycle reads current rows, and the transaction
+        is ended on exit so no connection or SQLite read snapshot is held between cycles.
+        """
+        if self._session is None:
+            self._session = Session(engine)
+        self._session.expire_all()
+        try:
+            yield self._session
+        finally:
+            # Discards anything uncommitted after an error; after a commit it just ends the read transaction
+            self._session.rollback()
+
+    def _warm_models(self):
+        for warmup in (warmup_classifier, warmup_asr):
+            try:
+                warmup()
+            except Exception as e:
+                logger.error(f"Model warmup failed, will retry on first use: {e}")
+
+    async def stop(self):
+        """Stops the loops and releases the inotify thread and its watches."""
+        self.running = False
+        logger.info("Stopping Recording Watcher...")
+        if self._observer is not None:
+            observer, self._observer = self._observer, None
+            observer.stop()
+            await asyncio.to_thread(observer.join)
+
+    def _start_observer(self):
+        """Watch the recordings tree for closed files; on any failure the watcher keeps polling every minute."""
+        try:
+            observer = Observer()
+            observer.schedule(
+                _ClosedFileHandler(asyncio.get_running_loop(), self._closed_queue), RECORDINGS_ROOT, recursive=True
+            )
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.warning(f"Could not watch {RECORDINGS_ROOT} for new recordings, polling instead: {e}")
+            return
+        self._observer = observer
 
     async def loop(self):
         while self.running:
             try:
-                await self.scan_files()
+                now = datetime.utcnow()
+                if (
+                    self._observer is None
+                    or not self._observer.is_alive()
+                    or self._last_full_scan is None
+                    or now - self._last_full_scan >= FULL_SCAN_INTERVAL
+                ):
+                    await self.scan_files()
+                    self._last_full_scan = now
                 await self.maybe_cleanup_old_recordings()
             except Exception as e:
                 logger.error(f"Error in watcher loop: {e}")
             await asyncio.sleep(60) # Scan every minute
 
     async def scan_files(self):
+        streams = await asyncio.to_thread(self._enabled_streams)
+
+        # Streams are scanned concurrently, each on its own thread with its own session:
+        # directory listing, stats and inserts are blocking calls that would otherwise stall the event loop
+        semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+        async def scan(stream: Stream) -> list:
+            async with semaphore:
+                return await asyncio.to_thread(self._scan_stream, stream)
+
+        results = await asyncio.gather(*(scan(stream) for stream in streams), return_exceptions=True)
+        for stream, result in zip(streams, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scanning stream {stream.name}: {result}")
+                continue
+            await self._queue_discovered(result)
+
+    def _enabled_streams(self) -> List[Stream]:
+        # Detached copies from the shared stream cache, which the stream endpoints invalidate on every change;
+        # the session is only used when the cache has expired
+        with self._cycle_session() as session:
+            return [stream for stream in stream_cache.get_all(session) if stream.enabled]
+
+    async def _queue_discovered(self, items: list):
+        for item in items:
+            logger.info(f"Discovered new recording: {os.path.basename(item[1])} (ID: {item[0]})")
+            # Queue for classification and ASR in background thread
+            await self._classify_queue.put(item)
+
+    async def _closed_worker(self):
+        """Index recordings as soon as inotify reports them closed, in batches."""
+        while self.running:
+            batch = await _next_batch(self._closed_queue, CLOSED_BATCH_SIZE, CLOSED_BATCH_WAIT_SECONDS)
+            try:
+                await self._queue_discovered(await asyncio.to_thread(self._index_closed_files, set(batch)))
+            except Exception as e:
+                logger.error(f"Error indexing {len(batch)} closed recording(s): {e}")
+
+    def _index_closed_files(self, paths: Set[str]) -> list:
+        """Worker-thread half of _closed_worker: route the closed files to their enabled streams' scans."""
+        by_stream = {}
+        for path in paths:
+            parts = os.path.relpath(path, RECORDINGS_ROOT).split(os.sep)
+            if len(parts) > 1 and parts[0] != "..":
+                by_stream.setdefault(parts[0], set()).add(path)
+
         with Session(engine) as session:
-            streams = session.exec(select(Stream)).all()
-            for stream in streams:
-                if not stream.enabled: continue
+            streams = stream_cache.get_all(session)
+        items = []
+        for stream in streams:
+            if stream.enabled and stream.name in by_stream:
+                items.extend(self._scan_stream(stream, by_stream[stream.name]))
+        return items
+
+    def _scan_stream(self, stream: Stream, closed_paths: Optional[Set[str]] = None) -> list:
+        """
+        Index the stream's new files; runs on a worker thread.
+        With closed_paths, only those files are considered, and they are known to be complete.
+        Returns the classify queue entries of the recordings it inserted.
+        """
+        closed_paths = closed_paths or set()
+        # setdefault is atomic, so every thread gets the same lock; _known is checked only while it is held
+        with self._scan_locks.setdefault(stream.id, threading.Lock()), Session(engine) as session:
+            # Check stream dir
+            # Pattern: /data/recordings/{stream.name}/{YYYY}/{MM}/{DD}/
+            # Project requirement: "Creates a recordings entry whenever a segment is created".
+        
+            base_dir = os.path.join(RECORDINGS_ROOT, stream.name)
+            # A closed file proves the directory exists
+            if not closed_paths and not self._dir_exists(base_dir): return []
+        
+            # Partition mtimes, taken before listing: a directory's mtime moves whenever a file is added to it,
+            # so one whose mtime still matches its watermark has nothing new and isn't listed again
+            dir_mtimes = {}
+            if closed_paths:
+                candidates = [
+                    entry
+                    for scan_dir in {os.path.dirname(path) for path in closed_paths}
+                    for entry in _iter_media(scan_dir)
+                    if entry.path in closed_paths
+                ]
+            else:
+                watermarks = self._dir_watermarks.get(stream.id, {})
+                for scan_dir in self._scan_dirs(session, stream, base_dir):
+                    try:
+                        dir_mtimes[scan_dir] = os.stat(scan_dir).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                candidates = [
+                    entry
+                    for scan_dir, mtime_ns in dir_mtimes.items()
+                    if watermarks.get(scan_dir) != mtime_ns
+                    for entry in _iter_media(scan_dir)
+                ]
+            if SCAN_SORT_BY_INODE:
+                # DirEntry.inode() comes from the directory listing, no stat needed
+                candidates.sort(key=lambda entry: entry.inode())
+            self._known.update(
+                (stream.id, path)
+                for path in self._known_paths(
+                    session, stream.id,
+                    [entry.path for entry in candidates if (stream.id, entry.path) not in self._known]
+                )
+            )
+
+            # New recordings of this stream, inserted together in one transaction,
+            # and the paths whose duration estimate is off and must be read from the file
+            new_recordings = []
+            unmeasured = set()
+            # Directories holding a file that a later scan must look at again
+            unsettled = set()
+            segment_seconds = self._resolve_segment_seconds(stream)
+            for entry in candidates:
+                file = entry.name
+                full_path = entry.path
+            
+                # Optimization: check if we already have this path
+                if (stream.id, full_path) in self._known:
+                    continue
                 
-                # Check stream dir
-                # Pattern: /data/recordings/{stream.name}/{YYYY}/{MM}/{DD}/
-                # We need to walk recursively? Or just check recent folders?
-                # For efficiency, we only check Today and Yesterday?
-                # Or we just walk the whole tree (might be slow if millions of files).
-                # Better: Since we name files by timestamp, we can just check if file is in DB.
-                # Project requirement: "Creates a recordings entry whenever a segment is created".
+                # It's new. Stats?
+                try:
+                    stats = entry.stat(follow_symlinks=False)
+                    size = stats.st_size
                 
-                base_dir = f"/data/recordings/{stream.name}"
-                if not os.path.exists(base_dir): continue
+                    # Skip if file is being written (modified < 10s ago), unless inotify saw it closed
+                    if full_path not in closed_paths and time.time() - stats.st_mtime < 10:
+                        unsettled.add(os.path.dirname(full_path))
+                        continue
+
+                    # Parse start time
+                    match = _TS_RE.match(file)
+                    if not match:
+                        continue
+                    ts = match.group(1)
+                    start_ts = datetime(
+                        int(ts[:4]), int(ts[4:6]), int(ts[6:8]), int(ts[8:10]), int(ts[10:12]), int(ts[12:14])
+                    )
+
+                    # ffmpeg stops writing a segment when it ends, so its mtime minus the start time in its
+                    # name is the duration. An estimate far off the segment length (a cut-short segment, or a file
+                    # touched later) isn't stored at all; the recording waits for get_duration with 0 instead
+                    duration = stats.st_mtime - start_ts.replace(tzinfo=timezone.utc).timestamp()
+                    duration_verified = abs(duration - segment_seconds) <= SEGMENT_DURATION_TOLERANCE_SECONDS
+                    if not duration_verified:
+                        unmeasured.add(full_path)
+                        duration = 0.0
                 
-                for root, _, files in os.walk(base_dir):
-                    for file in files:
-                        if not file.endswith((".wav", ".mp3")): continue
-                        
-                        full_path = os.path.join(root, file)
-                        
-                        # Optimization: check if we already have this path
-                        # Ideally we use a cache or bloom filter, but SQL is okay for <100k files.
-                        # We can query by path.
-                        existing = session.exec(
-                            select(Recording).where(
-                                Recording.path == full_path,
-                                Recording.status != "deleted"
-                            )
-                        ).first()
-                        if existing:
-                            continue
-                            
-                        # It's new. Stats?
-                        try:
-                            stats = os.stat(full_path)
-                            size = stats.st_size
-                            
-                            # Skip if file is being written (modified < 10s ago)
-                            if datetime.now().timestamp() - stats.st_mtime < 10:
-                                continue
-
-                            duration = self.get_duration(full_path)
-                            
-                            # Parse start time
-                            # chunk_20230101120000.mp3
-                            ts_str = file.split("_")[1].split(".")[0]
-                            start_ts = datetime.strptime(ts_str, "%Y%m%d%H%M%S")
-                            
-                            # Create recording entry immediately without classification/ASR
-                            rec = Recording(
-                                stream_id=stream.id,
-                                path=full_path,
-                                start_ts=start_ts,
-                                size_bytes=size,
-                                duration_seconds=duration,
-                                status="completed"
-                            )
-                            session.add(rec)
-                            session.commit()
-                            session.refresh(rec)
-                            logger.info(f"Discovered new recording: {file} (ID: {rec.id})")
-                            
-                            # Schedule classification and ASR in background thread
-                            stream_language = stream.language if hasattr(stream, 'language') and stream.language else "he"
-                            asyncio.create_task(
-                                self._process_recording_async(rec.id, full_path, stream_language)
-                            )
-                        except Exception as e:
-                            logger.error(f"Error processing file {file}: {e}")
-
-    async def _process_recording_async(self, recording_id: int, file_path: str, language: str):
+                    # Create recording entry immediately; classification and ASR are filled in
+                    # by the background workers
+                    rec = Recording(
+                        stream_id=stream.id,
+                        path=full_path,
+                        start_ts=start_ts,
+                        size_bytes=size,
+                        mime_type=media_type_for(full_path),
+                        duration_seconds=duration,
+                        duration_verified=duration_verified,
+                        status="completed"
+                    )
+                    new_recordings.append(rec)
+                except Exception as e:
+                    unsettled.add(os.path.dirname(full_path))
+                    logger.error(f"Error processing file {file}: {e}")
+
+            discovered = self._insert_recordings(session, new_recordings) if new_recordings else []
+            self._known.update((stream.id, full_path) for _, full_path in discovered)
+            inserted = {full_path for _, full_path in discovered}
+            unsettled.update(os.path.dirname(rec.path) for rec in new_recordings if rec.path not in inserted)
+
+            if not closed_paths:
+                self._caught_up.add(stream.id)
+                # The whole-tree walk of a new stream can't be watermarked: base_dir's mtime misses nested files.
+                # Recently changed directories aren't either, a coarse mtime could hide a file added within the same tick
+                now = time.time()
+                self._dir_watermarks[stream.id] = {
+                    scan_dir: mtime_ns
+                    for scan_dir, mtime_ns in dir_mtimes.items()
+                    if scan_dir != base_dir and scan_dir not in unsettled and now - mtime_ns / 1e9 > 10
+                }
+            if not discovered:
+                return []
+
+            stream_language = stream.language if hasattr(stream, 'language') and stream.language else "he"
+            forced_classification = self._resolve_forced_classification(stream)
+
+            return [
+                (rec_id, full_path, stream_language, forced_classification, full_path in unmeasured)
+                for rec_id, full_path in discovered
+            ]
+
+    def _dir_exists(self, path: str) -> bool:
+        """os.path.isdir, remembered for DIR_EXISTS_TTL_SECONDS; stream directories rarely come or go."""
+        now = time.monotonic()
+        cached = self._dir_exists_cache.get(path)
+        if cached and now - cached[0] < DIR_EXISTS_TTL_SECONDS:
+            return cached[1]
+        exists = os.path.isdir(path)
+        self._dir_exists_cache[path] = (now, exists)
+        return exists
+
+    def _scan_dirs(self, session: Session, stream: Stream, base_dir: str) -> List[str]:
         """
-        Process recording in background thread: classify and transcribe if needed.
-        This runs asynchronously to avoid blocking the main watcher loop.
+        Directories to scan for the stream's new files.
+        Files land in {base_dir}/YYYY/MM/DD by UTC date (see StreamManager.ensure_directories),
+        so only today's and, around midnight, yesterday's partition can receive new ones.
+        The first scan after startup also catches up on every partition since the stream's
+        newest recording, or on the whole tree if it has none yet.
+        """
+        utc_now = datetime.utcnow()
+        first_day = utc_now - timedelta(days=1)
+        if stream.id not in self._caught_up:
+            newest = session.exec(select(func.max(Recording.start_ts)).where(Recording.stream_id == stream.id)).one()
+            if newest is None:
+                return [base_dir]
+            first_day = min(first_day, newest)
+
+        days = (utc_now.date() - first_day.date()).days
+        return [
+            os.path.join(base_dir, (utc_now - timedelta(days=offset)).strftime("%Y/%m/%d"))
+            for offset in range(days, -1, -1)
+        ]
+
+    def _insert_recordings(self, session: Session, recordings: List[Recording]) -> List[tuple]:
+        """
+        Insert recordings in one transaction and return their (id, path).
+        If the batch fails, retry it row by row so one bad row doesn't cost the rest.
         """
         try:
-            # Run classification in thread pool
-            loop = asyncio.get_event_loop()
-            classification = await loop.run_in_executor(
-                self._executor,
-                classify_audio,
-                file_path
-            )
-            logger.info(f"Classified recording {recording_id} as '{classification}'")
-            
-            # Update database with classification
-            with Session(engine) as session:
+            session.add_all(recordings)
+            # Flush assigns ids
+            session.flush()
+            inserted = [(rec.id, rec.path) for rec in recordings]
+            session.commit()
+            return inserted
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Batch insert of {len(recordings)} recordings failed, retrying one by one: {e}")
+
+        inserted = []
+        for rec in recordings:
+            try:
+                session.add(rec)
+                session.flush()
+                rec_id = rec.id
+                session.commit()
+                inserted.append((rec_id, rec.path))
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Failed to insert recording {rec.path}: {e}")
+        return inserted
+
+    def _known_paths(self, session: Session, stream_id: int, paths: List[str]) -> Set[str]:
+        """
+        The subset of paths that already have a live recording of this stream.
+        One IN query per KNOWN_PATHS_CHUNK paths instead of one SELECT per file, chunked to stay
+        below SQLite's bound parameter limit.
+        """
+        known = set()
+        for i in range(0, len(paths), KNOWN_PATHS_CHUNK):
+            known.update(session.exec(
+                select(Recording.path).where(
+                    Recording.stream_id == stream_id,
+                    Recording.path.in_(paths[i:i + KNOWN_PATHS_CHUNK]),
+                    Recording.status != "deleted"
+                )
+            ).all())
+        return known
+
+    async def _classify_worker(self):
+        """
+        Measure and classify queued recordings in batches, one forward pass and one transaction per batch,
+        and queue the speech ones for ASR.
+        """
+        loop = asyncio.get_running_loop()
+        while self.running:
+            batch = await _next_batch(self._classify_queue, CLASSIFY_BATCH_SIZE, CLASSIFY_BATCH_WAIT_SECONDS)
+            try:
+                durations, classifications = await loop.run_in_executor(
+                    self._executor,
+                    self._measure_and_classify,
+                    [file_path for _, file_path, _, _, _ in batch],
+                    [forced for _, _, _, forced, _ in batch],
+                    [measure for _, _, _, _, measure in batch]
+                )
+
+                # Update database with durations and classifications
+                await asyncio.to_thread(self._store_classifications, batch, durations, classifications)
+
+                # If speech, hand over to the ASR worker
+                for (recording_id, file_path, language, _, _), classification in zip(batch, classifications):
+                    if classification == "speech":
+                        logger.info(f"Queued recording {recording_id} for ASR with language {language}")
+                        await self._asr_queue.put((recording_id, file_path, language))
+                    else:
+                        logger.info(f"Skipping ASR for recording {recording_id} (classification: {classification})")
+            except Exception as e:
+                logger.error(f"Error classifying recordings {[recording_id for recording_id, _, _, _, _ in batch]}: {e}")
+
+    def _store_classifications(self, batch: list, durations: list, classifications: list):
+        """Write a classify batch's results in one transaction; runs on a worker thread, off the event loop."""
+        with Session(engine) as session:
+            for (recording_id, _, _, _, _), duration, classification in zip(batch, durations, classifications):
                 recording = session.get(Recording, recording_id)
-                if recording:
+                if not recording:
+                    continue
+                # None: not measured, or unreadable; an unreadable row stays unverified and is retried
+                if duration is not None:
+                    recording.duration_seconds = duration
+                    recording.duration_verified = True
+                if classification is not None:
                     recording.classification = classification
-                    session.add(recording)
-                    session.commit()
-            
-            # If speech, run ASR in thread pool
-            if classification == "speech":
-                logger.info(f"Starting ASR for recording {recording_id} with language {language}")
-                result = await loop.run_in_executor(
+                    logger.info(f"Classified recording {recording_id} as '{classification}'")
+                session.add(recording)
+            session.commit()
+
+    def _unverified_recordings(self) -> List[tuple]:
+        """(id, path) of the live recordings whose duration still has to be read from the file."""
+        with self._cycle_session() as session:
+            return session.exec(
+                select(Recording.id, Recording.path).where(
+                    Recording.duration_verified == False,
+                    Recording.status != "deleted"
+                )
+            ).all()
+
+    async def _measure_unverified(self, recordings: List[tuple]):
+        """Measure left-over unverified recordings in batches, sharing the worker thread with classification."""
+        loop = asyncio.get_running_loop()
+        logger.info(f"Measuring {len(recordings)} recording(s) left unverified by a previous run")
+        for i in range(0, len(recordings), CLASSIFY_BATCH_SIZE):
+            batch = recordings[i:i + CLASSIFY_BATCH_SIZE]
+            try:
+                durations = await loop.run_in_executor(
+                    self._executor, lambda: [self.get_duration(path) for _, path in batch]
+                )
+                await asyncio.to_thread(self._store_durations, [recording_id for recording_id, _ in batch], durations)
+            except Exception as e:
+                logger.error(f"Error measuring recordings {[recording_id for recording_id, _ in batch]}: {e}")
+
+    def _store_durations(self, recording_ids: List[int], durations: List[Optional[float]]):
+        """Write measured durations in one transaction; unreadable ones (None) stay unverified."""
+        with Session(engine) as session:
+            for recording_id, duration in zip(recording_ids, durations):
+                if duration is None:
+                    continue
+                session.exec(
+                    update(Recording)
+                    .where(Recording.id == recording_id)
+                    .values(duration_seconds=duration, duration_verified=True)
+                )
+            session.commit()
+
+    def _measure_and_classify(self, file_paths: list, forced: list, measure: list) -> tuple:
+        """
+        Worker-thread half of _classify_worker: durations of the recordings flagged for measuring
+        (None for the rest, and where the file can't be read), then one classification batch for the recordings without a forced classification.
+        Durations are kept even if classification fails.
+        """
+        durations = [self.get_duration(file_path) if flag else None for file_path, flag in zip(file_paths, measure)]
+        classifications = list(forced)
+        pending = [i for i, label in enumerate(forced) if label is None]
+        if pending:
+            try:
+                for i, label in zip(pending, classify_audio_batch([file_paths[i] for i in pending])):
+                    classifications[i] = label
+            except Exception as e:
+                logger.error(f"Classification failed for {len(pending)} recording(s): {e}")
+        return durations, classifications
+
+    async def _asr_worker(self):
+        """
+        Transcribe queued recordings in batches: the model stays loaded and locked across a batch,
+        and each batch is written back in one transaction.
+        """
+        loop = asyncio.get_running_loop()
+        while self.running:
+            batch = await _next_batch(self._asr_queue, ASR_BATCH_SIZE, ASR_BATCH_WAIT_SECONDS)
+            try:
+                logger.info(f"Starting ASR for {len(batch)} recording(s)")
+                results = await loop.run_in_executor(
                     self._executor,
-                    transcribe,
-                    file_path,
-                    "tiny",
-                    language
+                    transcribe_batch,
+                    [(file_path, language) for _, file_path, language in batch],
+                    "tiny"
                 )
-                
-                # Update database with transcription
-                with Session(engine) as session:
-                    recording = session.get(Recording, recording_id)
-                    if recording:
-                        recording.transcript = result["transcript"]
-                        recording.transcript_json = {"segments": result["segments"]}
-                        recording.asr_model = result["model"]
-                        recording.asr_confidence = result["confidence"]
-                        recording.asr_ts = datetime.utcnow()
-                        session.add(recording)
-                        session.commit()
-                        logger.info(f"Transcribed recording {recording_id}: {len(result['transcript'])} chars, {len(result['segments'])} segments")
-            else:
-                logger.info(f"Skipping ASR for recording {recording_id} (classification: {classification})")
-                
+
+                # Update database with transcriptions
+                await asyncio.to_thread(self._store_transcripts, batch, results)
+            except Exception as e:
+                logger.error(f"Error transcribing recordings {[recording_id for recording_id, _, _ in batch]}: {e}")
+
+    def _store_transcripts(self, batch: list, results: list):
+        """Write an ASR batch's transcripts in one transaction; runs on a worker thread, off the event loop."""
+        with Session(engine) as session:
+            asr_ts = datetime.utcnow()
+            for (recording_id, _, _), result in zip(batch, results):
+                if result is None:
+                    continue
+                recording = session.get(Recording, recording_id)
+                if recording:
+                    recording.transcript = result["transcript"]
+                    recording.transcript_json = {"segments": result["segments"]}
+                    recording.asr_model = result["model"]
+                    recording.asr_confidence = result["confidence"]
+                    recording.asr_ts = asr_ts
+                    session.add(recording)
+                    logger.info(f"Transcribed recording {recording_id}: {len(result['transcript'])} chars, {len(result['segments'])} segments")
+            session.commit()
+
+    def get_duration(self, path: str) -> Optional[float]:
+        # Read the duration from the container header in-process; libavformat (PyAV, also in-process,
+        # no ffprobe subprocess) is the fallback for other formats and headers the parsers reject.
+        # None when nothing can read it, so the caller can tell a failed read from a zero-length file
+        try:
+            if path.endswith(".wav"):
+                return float(sf.info(path).duration)
+            if path.endswith(".mp3"):
+                return float(MP3(path).info.length)
         except Exception as e:
-            logger.error(f"Error processing recording {recording_id}: {e}")
+            logger.warning(f"Could not read duration of {path} from its header, trying libav: {e}")
 
-    def get_duration(self, path: str) -> float:
         try:
-            cmd = [
-                "ffprobe", 
-                "-v", "error", 
-                "-show_entries", "format=duration", 
-                "-of", "default=noprint_wrappers=1:nokey=1", 
-                path
-            ]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
+            with av.open(path, metadata_errors="ignore") as container:
+                if container.duration is not None:
+                    return container.duration / av.time_base
         except Exception as e:
             logger.error(f"Error getting duration for {path}: {e}")
-        return 0.0
+        return None
 
     async def maybe_cleanup_old_recordings(self):
         """
@@ -193,8 +658,9 @@ class RecordingWatcher:
 
     def cleanup_old_recordings(self):
         utc_now = datetime.utcnow()
-        with Session(engine) as session:
-            streams = session.exec(select(Stream)).all()
+        # Unlinks are I/O bound: overlap them instead of paying each one's latency in turn
+        with self._cycle_session() as session, ThreadPoolExecutor(max_workers=CLEANUP_DELETE_WORKERS) as delete_pool:
+            streams = stream_cache.get_all(session)
 
             for stream in streams:
                 retention_days = self._resolve_retention_days(stream)
@@ -202,8 +668,9 @@ class RecordingWatcher:
                     continue
 
                 cutoff = utc_now - timedelta(days=retention_days)
+                # Plain (id, path) rows: nothing enters the identity map, so there is nothing to autoflush or expire
                 old_recordings = session.exec(
-                    select(Recording)
+                    select(Recording.id, Recording.path)
                     .where(
                         Recording.stream_id == stream.id,
                         Recording.start_ts < cutoff,
@@ -221,24 +688,124 @@ class RecordingWatcher:
                     f"older than {retention_days} day(s)."
                 )
 
-                for recording in old_recordings:
+                removed = self._unlink_many([r.path for r in old_recordings], delete_pool)
+                deleted = [recording for recording, ok in zip(old_recordings, removed) if ok]
+                deleted_ids = [recording.id for recording in deleted]
+                if not deleted_ids:
+                    continue
+
+                # Mark the whole batch in one statement and one commit
+                try:
+                    session.exec(
+                        update(Recording)
+                        .where(Recording.id.in_(deleted_ids))
+                        .values(status="deleted")
+                    )
+                    session.commit()
+                    self._known.difference_update((stream.id, recording.path) for recording in deleted)
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"Failed to mark {len(deleted_ids)} recordings of stream {stream.name} as deleted: {e}")
+
+    def _unlink_many(self, paths: List[str], delete_pool: ThreadPoolExecutor) -> List[bool]:
+        """_safe_unlink for every path: through io_uring when available, else overlapped on the pool."""
+        if liburing is not None:
+            try:
+                return self._uring_unlink_many(paths)
+            except Exception as e:
+                logger.warning(f"io_uring unlink failed, falling back to the thread pool: {e}")
+        return list(delete_pool.map(self._safe_unlink, paths))
+
+    def _uring_unlink_many(self, paths: List[str]) -> List[bool]:
+        """
+        _safe_unlink semantics, with up to URING_QUEUE_DEPTH unlinks submitted per syscall.
+        Files already handled before a failure are reported as such, so a fallback pass finds them missing.
+        """
+        results = [True] * len(paths)
+        pending = [(i, path) for i, path in enumerate(paths) if path]
+        ring = liburing.Ring()
+        cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(URING_QUEUE_DEPTH, ring)
+        try:
+            for start in range(0, len(pending), URING_QUEUE_DEPTH):
+                chunk = pending[start:start + URING_QUEUE_DEPTH]
+                for i, path in chunk:
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_unlink(sqe, path)
+                    sqe.user_data = i
+                liburing.io_uring_submit(ring)
+
+                for _ in chunk:
+                    liburing.io_uring_wait_cqe(ring, cqe)
+                    completion = cqe[0]
+                    i = completion.user_data
                     try:
-                        if recording.path and os.path.exists(recording.path):
-                            os.remove(recording.path)
-                            logger.info(f"Deleted old recording file {recording.path}")
-                        elif recording.path:
-                            logger.warning(f"Recording file already missing: {recording.path}")
-
-                        recording.status = "deleted"
-                        session.add(recording)
-                        session.commit()
-                    except Exception as e:
-                        session.rollback()
-                        logger.error(f"Failed to delete recording {recording.id}: {e}")
+                        # Reading res raises the completion's errno, like os.unlink would
+                        completion.res
+                        logger.info(f"Deleted old recording file {paths[i]}")
+                    except FileNotFoundError:
+                        logger.warning(f"Recording file already missing: {paths[i]}")
+                    except OSError as e:
+                        logger.error(f"Failed to delete recording file {paths[i]}: {e}")
+                        results[i] = False
+                    finally:
+                        liburing.io_uring_cqe_seen(ring, completion)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+        return results
+
+    def _safe_unlink(self, path: str) -> bool:
+        """
+        Remove a recording's file; True when it is gone (or was already missing).
+        Unlinks without checking first: a missing file costs the same one syscall as a present one.
+        """
+        if not path:
+            return True
+        try:
+            os.unlink(path)
+            logger.info(f"Deleted old recording file {path}")
+        except FileNotFoundError:
+            logger.warning(f"Recording file already missing: {path}")
+        except OSError as e:
+            logger.error(f"Failed to delete recording file {path}: {e}")
+            return False
+        return True
+
+    def _resolve_forced_classification(self, stream: Stream) -> Optional[str]:
+        # Streams with known content (all talk, all music) can skip the classifier
+        params = stream.optional_params or {}
+        label = params.get("force_classification")
+        if label is None:
+            return None
+        if label not in CATEGORIES:
+            logger.warning(
+                "Invalid force_classification '%s' for stream %s. Classifying normally.",
+                label,
+                stream.name,
+            )
+            return None
+        return label
+
+    def _resolve_segment_seconds(self, stream: Stream) -> int:
+        params = stream.mandatory_params or {}
+        raw_value = params.get("segment_time", DEFAULT_SEGMENT_SECONDS)
+        try:
+            return int(raw_value)
+        except (TypeError, ValueError):
+            return DEFAULT_SEGMENT_SECONDS
 
     def _resolve_retention_days(self, stream: Stream) -> int:
+        # Parsed (and warned about) once per value; editing the stream's params changes the value
         params = stream.optional_params or {}
         raw_value = params.get("retention_days", DEFAULT_RETENTION_DAYS)
+        cached = self._retention_cache.get(stream.id)
+        if cached is not None and cached[0] == raw_value:
+            return cached[1]
+        days = self._parse_retention_days(stream, raw_value)
+        self._retention_cache[stream.id] = (raw_value, days)
+        return days
+
+    def _parse_retention_days(self, stream: Stream, raw_value) -> int:
         try:
             days = int(raw_value)
         except (TypeError, ValueError):
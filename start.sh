@@ -21,4 +21,4 @@ else
 fi
 
 echo "Starting Application..."
-exec uvicorn app.api.main:app --host 0.0.0.0 --port 8000
+exec uvicorn app.api.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools